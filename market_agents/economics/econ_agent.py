@@ -2,6 +2,7 @@ from typing import List, Dict, Optional
 from pydantic import BaseModel, Field, model_validator, computed_field
 import random
 import logging
+import sys
 from functools import cached_property
 from market_agents.economics.econ_models import (
     MarketAction,
@@ -207,6 +208,11 @@ class EconomicAgent(BaseModel):
     def generate_bid(self, good_name: str) -> Optional[Bid]:
         if not self._can_generate_bid(good_name):
             return None
+        return self.place_bid(good_name)
+
+    def place_bid(self, good_name: str) -> Optional[Bid]:
+        """ prices and records a bid without re-running the eligibility check,
+        for callers that already applied can_bid to the agent's state"""
         price = self._calculate_bid_price(good_name)
         if price is not None:
             bid = Bid(price=price, quantity=1)
@@ -219,6 +225,11 @@ class EconomicAgent(BaseModel):
     def generate_ask(self, good_name: str) -> Optional[Ask]:
         if not self._can_generate_ask(good_name):
             return None
+        return self.place_ask(good_name)
+
+    def place_ask(self, good_name: str) -> Optional[Ask]:
+        """ prices and records an ask without re-running the eligibility check,
+        for callers that already applied can_ask to the agent's state"""
         price = self._calculate_ask_price(good_name)
         if price is not None:
             ask = Ask(price=price, quantity=1)
@@ -232,20 +243,22 @@ class EconomicAgent(BaseModel):
         if self.is_buyer(trade.good_name) and trade.buyer_id == self.id:
             marginal_value = self.get_previous_value(trade.good_name)
             if marginal_value is None:
-                print("trade rejected because marginal_value is None")
+                logger.debug("trade rejected because marginal_value is None")
                 return False
-            print(f"Buyer {self.id} would accept trade with marginal_value: {marginal_value}, trade.price: {trade.price}")
+            logger.debug("Buyer %s would accept trade with marginal_value: %s, trade.price: %s", self.id, marginal_value, trade.price)
             return marginal_value >= trade.price
         elif self.is_seller(trade.good_name) and trade.seller_id == self.id:
             marginal_cost = self.get_previous_cost(trade.good_name)
             if marginal_cost is None:
-                print("trade rejected because marginal_cost is None")
+                logger.debug("trade rejected because marginal_cost is None")
                 return False
-            print(f"Seller {self.id} would accept trade with marginal_cost: {marginal_cost}, trade.price: {trade.price}")
+            logger.debug("Seller %s would accept trade with marginal_cost: %s, trade.price: %s", self.id, marginal_cost, trade.price)
             return trade.price >= marginal_cost
         else:
-            self_type = "buyer" if self.is_buyer(trade.good_name) else "seller"
-            print(f"trade rejected because it's not for the agent {self.id} vs trade.buyer_id: {trade.buyer_id}, trade.seller_id: {trade.seller_id} with type {self_type}")
+            if logger.isEnabledFor(logging.DEBUG):
+                self_type = "buyer" if self.is_buyer(trade.good_name) else "seller"
+                logger.debug("trade rejected because it's not for the agent %s vs trade.buyer_id: %s, trade.seller_id: %s with type %s",
+                             self.id, trade.buyer_id, trade.seller_id, self_type)
             return False
 
 
@@ -273,10 +286,7 @@ class EconomicAgent(BaseModel):
         else:
             raise ValueError(f"Agent is neither a buyer nor a seller for trade {trade}")
         # Only update the endowment after passing the value error checks
-        old_utility = self.calculate_utility(self.endowment.current_basket)
         self.endowment.add_trade(trade)
-        new_utility = self.calculate_utility(self.endowment.current_basket)
-        # logger.info(f"Agent {self.id} processed trade. New utility: {new_utility:.2f}, old utility: {old_utility:.2f}, trades in endowment: {self.endowment.trades}, current basket: {self.endowment.current_basket} starting basket: {self.endowment.initial_basket}")
 
     def reset_pending_orders(self,good_name:str):
         self.pending_orders[good_name] = []
@@ -306,6 +316,22 @@ class EconomicAgent(BaseModel):
 
 
 
+    def calculate_trade_surplus(self, trade: Trade) -> float:
+        """ returns the utility this agent gains from the trade, read off the schedule
+        for the units it moves instead of re-summing the whole basket.
+        must be called before the trade is processed"""
+        good_name = trade.good_name
+        quantity = int(trade.quantity)
+        held_quantity = self.endowment.current_basket.get_good_quantity(good_name)
+        if trade.buyer_id == self.id:
+            schedule = self.value_schedules[good_name]
+            value = sum(schedule.get_value(held_quantity + q) for q in range(1, quantity + 1))
+            return value - trade.price * quantity
+        schedule = self.cost_schedules[good_name]
+        sold_units = self.endowment.initial_basket.get_good_quantity(good_name) - held_quantity
+        cost = sum(schedule.get_value(sold_units + q) for q in range(1, quantity + 1))
+        return trade.price * quantity - cost
+
     def calculate_individual_surplus(self) -> float:
         current_utility = self.calculate_utility(self.endowment.current_basket)
         surplus = current_utility - self.initial_utility
@@ -313,6 +339,18 @@ class EconomicAgent(BaseModel):
 
 
 
+    @staticmethod
+    def can_bid(available_cash, current_quantity, pending_quantity, num_units):
+        """ buyers can bid while they have cash left and holdings plus pending bids are under
+        their unit cap. works elementwise on numpy arrays as well as on scalars"""
+        return (available_cash > 0) & (current_quantity + pending_quantity < num_units)
+
+    @staticmethod
+    def can_ask(current_quantity, pending_quantity):
+        """ sellers can ask while holdings exceed their pending asks.
+        works elementwise on numpy arrays as well as on scalars"""
+        return current_quantity - pending_quantity > 0
+
     def _can_generate_bid(self, good_name: str) -> bool:
         if not self.is_buyer(good_name):
             return False
@@ -321,17 +359,15 @@ class EconomicAgent(BaseModel):
         if available_cash <= 0:
             return False
         current_quantity = self.endowment.current_basket.get_good_quantity(good_name)
-        pending_quantity = sum(order.quantity for order in self.pending_orders.get(good_name, []) if isinstance(order, Bid))
-        total_quantity = current_quantity + pending_quantity
-        return total_quantity < self.value_schedules[good_name].num_units
+        pending_quantity = self.get_pending_bid_quantity(good_name)
+        return self.can_bid(available_cash, current_quantity, pending_quantity, self.value_schedules[good_name].num_units)
 
     def _can_generate_ask(self, good_name: str) -> bool:
         if not self.is_seller(good_name):
             return False
         current_quantity = self.endowment.current_basket.get_good_quantity(good_name)
-        pending_quantity = sum(order.quantity for order in self.pending_orders.get(good_name, []) if isinstance(order, Ask))
-        total_quantity = current_quantity - pending_quantity
-        return total_quantity > 0
+        pending_quantity = self.get_pending_ask_quantity(good_name)
+        return self.can_ask(current_quantity, pending_quantity)
 
     def _calculate_bid_price(self, good_name: str) -> Optional[float]:
 
@@ -340,6 +376,7 @@ class EconomicAgent(BaseModel):
             return None
         max_bid = min(self.endowment.current_basket.cash, current_value*0.99)
         price = random.uniform(max_bid * (1 - self.max_relative_spread), max_bid)
+        assert price <= current_value, f"bid price {price} above current value {current_value}"
         return price
 
     def _calculate_ask_price(self, good_name: str) -> Optional[float]:
@@ -348,6 +385,7 @@ class EconomicAgent(BaseModel):
             return None
         min_ask = current_cost * 1.01
         price = random.uniform(min_ask, min_ask * (1 + self.max_relative_spread))
+        assert price >= current_cost, f"ask price {price} below current cost {current_cost}"
         return price
 
     def print_status(self):
@@ -391,12 +429,15 @@ class ZiFactory(BaseModel):
         params = self.seller_params.model_copy(update={'id': f"seller_{index}_{self.id}", 'is_buyer': False})
         return EconomicAgent.from_zi_params(params)
     
-def simulate_trading(buyers: List[EconomicAgent], sellers: List[EconomicAgent], goods: List[str], max_attempts: int = 1000):
+def simulate_trading(buyers: List[EconomicAgent], sellers: List[EconomicAgent], goods: List[str], max_attempts: int = 1000, verbose: bool = False):
     trade_ids = {good: 0 for good in goods}
     
     for good in goods:
-        print(f"\nTrading {good}:")
+        if verbose:
+            print(f"\nTrading {good}:")
         for attempt in range(max_attempts):
+            # Verbose lines for the attempt are written in one go rather than one print each
+            parts = []
             for buyer in buyers:
                 for seller in sellers:
                     buyer_value = buyer.get_current_value(good)
@@ -418,13 +459,16 @@ def simulate_trading(buyers: List[EconomicAgent], sellers: List[EconomicAgent],
                                         bid_price=bid.price,
                                         ask_price=ask.price
                                     )
-                                    print(f"  Trade executed: Price {good} = {trade_price:.2f}, Quantity = 1")
+                                    if verbose:
+                                        parts.append(f"  Trade executed: Price {good} = {trade_price:.2f}, Quantity = 1")
                                     
                                     buyer.process_trade(trade)
                                     seller.process_trade(trade)
                                     trade_ids[good] += 1
-                        else:
-                            print(f"  No match found for {good} at attempt {attempt} because buyer_value {buyer_value} < seller_cost {seller_cost}")
+                        elif verbose:
+                            parts.append(f"  No match found for {good} at attempt {attempt} because buyer_value {buyer_value} < seller_cost {seller_cost}")
+            if parts:
+                sys.stdout.write("\n".join(parts) + "\n")
     
     return trade_ids
 
@@ -480,7 +524,7 @@ if __name__ == "__main__":
         seller.print_status()
 
     # Simulate trading
-    trade_ids = simulate_trading(buyers, sellers, goods)
+    trade_ids = simulate_trading(buyers, sellers, goods, verbose=True)
 
     # Print final status
     print("\nFinal Status:")
@@ -1,16 +1,62 @@
 # double_auction.py
 
 import logging
+import numpy as np
+from datetime import datetime
 from typing import Any, List, Dict, Union, Type, Optional, Tuple
 from pydantic import BaseModel, Field, field_validator
 from market_agents.environments.environment import (
-    Mechanism, LocalAction, GlobalAction, LocalObservation, GlobalObservation,
+    EnvironmentHistory, Mechanism, LocalAction, GlobalAction, LocalObservation, GlobalObservation,
     EnvironmentStep, ActionSpace, ObservationSpace, MultiAgentEnvironment
 )
 from market_agents.economics.econ_models import Bid, Ask, MarketAction, Trade
 import random
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernel below then runs as plain Python
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
 logger = logging.getLogger(__name__)
 
+
+@njit(cache=True)
+def _match_kernel(bid_prices, bid_quantities, ask_prices, ask_quantities):
+    """Fill crossing orders from bids sorted best-first and asks sorted best-first.
+
+    Quantities are decremented in place so partially filled orders keep their residual
+    at the head of the book. Returns the fills as (bid_row, ask_row, price, quantity)
+    arrays, with rows indexing into the sorted inputs.
+    """
+    max_fills = len(bid_prices) + len(ask_prices)
+    bid_rows = np.empty(max_fills, dtype=np.int64)
+    ask_rows = np.empty(max_fills, dtype=np.int64)
+    prices = np.empty(max_fills, dtype=np.float64)
+    quantities = np.empty(max_fills, dtype=np.int64)
+
+    n = 0
+    i = 0
+    j = 0
+    while i < len(bid_prices) and j < len(ask_prices) and bid_prices[i] >= ask_prices[j]:
+        quantity = min(bid_quantities[i], ask_quantities[j])
+        bid_rows[n] = i
+        ask_rows[n] = j
+        prices[n] = (bid_prices[i] + ask_prices[j]) / 2
+        quantities[n] = quantity
+        n += 1
+
+        bid_quantities[i] -= quantity
+        ask_quantities[j] -= quantity
+        if bid_quantities[i] == 0:
+            i += 1
+        if ask_quantities[j] == 0:
+            j += 1
+
+    return bid_rows[:n], ask_rows[:n], prices[:n], quantities[:n]
+
+
 class MarketSummary(BaseModel):
     trades_count: int = Field(default=0, description="Number of trades executed")
     average_price: float = Field(default=0.0, description="Average price of trades")
@@ -109,64 +155,90 @@ class DoubleAuction(Mechanism):
             else:
                 logger.error(f"Invalid action type from agent {agent_id}: {type(action)}")
 
+    @staticmethod
+    def _orders_to_soa(orders: List[AuctionAction]) -> Dict[str, np.ndarray]:
+        return {
+            "price": np.fromiter((order.action.price for order in orders), dtype=np.float64, count=len(orders)),
+            "quantity": np.fromiter((order.action.quantity for order in orders), dtype=np.int64, count=len(orders)),
+        }
+
     def _match_orders(self) -> List[Trade]:
-        trades = []
+        if not self.waiting_bids or not self.waiting_asks:
+            return []
+
         trade_id = len(self.trades)
+        bids = self._orders_to_soa(self.waiting_bids)
+        asks = self._orders_to_soa(self.waiting_asks)
 
-        # Sort bids and asks
-        self.waiting_bids.sort(key=lambda x: x.action.price, reverse=True)
-        self.waiting_asks.sort(key=lambda x: x.action.price)
-
-        while self.waiting_bids and self.waiting_asks:
-            bid = self.waiting_bids[0]
-            ask = self.waiting_asks[0]
-
-            if bid.action.price >= ask.action.price:
-                trade_price = (bid.action.price + ask.action.price) / 2
-
-                trade = Trade(
-                    trade_id=trade_id,
-                    buyer_id=bid.agent_id,
-                    seller_id=ask.agent_id,
-                    price=trade_price,
-                    quantity=1,
-                    good_name=self.good_name,
-                    bid_price=bid.action.price,
-                    ask_price=ask.action.price
-                )
-                trades.append(trade)
-                trade_id += 1
-
-                # Remove matched bid and ask
-                self.waiting_bids.pop(0)
-                self.waiting_asks.pop(0)
-            else:
-                # No more matches possible
-                break
+        # Nothing can cross when the best bid is under the best ask; skip the sorts and the kernel
+        if bids["price"].max() < asks["price"].min():
+            return []
+
+        # Stable sorts keep arrival order among equal prices (price-time priority)
+        bid_rank = np.argsort(-bids["price"], kind="stable")
+        ask_rank = np.argsort(asks["price"], kind="stable")
+        bid_quantities = bids["quantity"][bid_rank]
+        ask_quantities = asks["quantity"][ask_rank]
+
+        bid_rows, ask_rows, trade_prices, trade_quantities = _match_kernel(
+            bids["price"][bid_rank], bid_quantities, asks["price"][ask_rank], ask_quantities
+        )
+        matched_bids = bid_rank[bid_rows]
+        matched_asks = ask_rank[ask_rows]
+
+        # Trades from one matching pass share a timestamp, and .tolist() hands plain Python
+        # scalars to the validator instead of indexing NumPy arrays element by element
+        timestamp = datetime.now()
+        trades = []
+        fills = zip(matched_bids.tolist(), matched_asks.tolist(), trade_prices.tolist(), trade_quantities.tolist())
+        for offset, (bid_index, ask_index, price, quantity) in enumerate(fills):
+            bid = self.waiting_bids[bid_index]
+            ask = self.waiting_asks[ask_index]
+            trades.append(Trade.model_validate({
+                "trade_id": trade_id + offset,
+                "buyer_id": bid.agent_id,
+                "seller_id": ask.agent_id,
+                "price": price,
+                "quantity": quantity,
+                "good_name": self.good_name,
+                "bid_price": bid.action.price,
+                "ask_price": ask.action.price,
+                "timestamp": timestamp,
+            }))
+
+        # Orders with no residual quantity leave the book; AuctionAction pins quantity to 1,
+        # so matched orders are always fully filled. The rest stay in arrival order.
+        bid_open = np.empty(len(self.waiting_bids), dtype=bool)
+        ask_open = np.empty(len(self.waiting_asks), dtype=bool)
+        bid_open[bid_rank] = bid_quantities > 0
+        ask_open[ask_rank] = ask_quantities > 0
+        self.waiting_bids = [bid for bid, is_open in zip(self.waiting_bids, bid_open) if is_open]
+        self.waiting_asks = [ask for ask, is_open in zip(self.waiting_asks, ask_open) if is_open]
 
         return trades
 
     def _create_observations(self, new_trades: List[Trade], market_summary: MarketSummary) -> Dict[str, AuctionLocalObservation]:
         observations = {}
 
-        # Agents with trades in this round
-        participant_ids = set([trade.buyer_id for trade in new_trades] + [trade.seller_id for trade in new_trades])
+        # Index trades and waiting orders by agent in one pass instead of rescanning them for every agent
+        agent_trades: Dict[str, List[Trade]] = {}
+        for trade in new_trades:
+            agent_trades.setdefault(trade.buyer_id, []).append(trade)
+            if trade.seller_id != trade.buyer_id:
+                agent_trades.setdefault(trade.seller_id, []).append(trade)
 
-        # Agents with waiting orders
-        waiting_order_agents = set([bid.agent_id for bid in self.waiting_bids] + [ask.agent_id for ask in self.waiting_asks])
+        agent_waiting_orders: Dict[str, List[Union[Bid, Ask]]] = {}
+        for order in self.waiting_bids + self.waiting_asks:
+            agent_waiting_orders.setdefault(order.agent_id, []).append(order.action)
 
-        all_agent_ids = participant_ids.union(waiting_order_agents)
+        # Agents with trades in this round or with waiting orders; every agent shares the same market summary
+        all_agent_ids = {**dict.fromkeys(agent_trades), **dict.fromkeys(agent_waiting_orders)}
 
         for agent_id in all_agent_ids:
-            agent_trades = [trade for trade in new_trades if trade.buyer_id == agent_id or trade.seller_id == agent_id]
-            agent_waiting_bids = [bid.action for bid in self.waiting_bids if bid.agent_id == agent_id]
-            agent_waiting_asks = [ask.action for ask in self.waiting_asks if ask.agent_id == agent_id]
-            agent_waiting_orders = agent_waiting_bids + agent_waiting_asks
-
             observation = AuctionObservation(
-                trades=agent_trades,
+                trades=agent_trades.get(agent_id, []),
                 market_summary=market_summary,
-                waiting_orders=agent_waiting_orders
+                waiting_orders=agent_waiting_orders.get(agent_id, [])
             )
 
             observations[agent_id] = AuctionLocalObservation(
@@ -209,3 +281,9 @@ class AuctionMarket(MultiAgentEnvironment):
     observation_space : AuctionObservationSpace = Field(default_factory=AuctionObservationSpace, description="Observation space of the auction market")
     mechanism : DoubleAuction = Field(default_factory=DoubleAuction, description="Mechanism of the auction market")
 
+    def reset(self) -> GlobalObservation:
+        self.current_step = 0
+        self.history = EnvironmentHistory()
+        self.mechanism.reset()
+        return AuctionGlobalObservation(observations={})
+
@@ -1,5 +1,6 @@
 # stock_market.py
 
+import heapq
 import logging
 import random
 from typing import Any, List, Dict, Union, Type, Optional, Tuple
@@ -134,13 +135,16 @@ class StockMarketMechanism(Mechanism):
         trades = []
         trade_id = len(self.trades)
 
-        # Sort buy and sell orders
-        self.order_book_buy.sort(key=lambda x: (-x.price, x.agent_id))
-        self.order_book_sell.sort(key=lambda x: (x.price, x.agent_id))
+        # Heaps keyed on price, then book position, for price-time priority.
+        # A partially filled order keeps its key and stays on top of its heap.
+        buy_heap = [(-order.price, index, order) for index, order in enumerate(self.order_book_buy)]
+        sell_heap = [(order.price, index, order) for index, order in enumerate(self.order_book_sell)]
+        heapq.heapify(buy_heap)
+        heapq.heapify(sell_heap)
 
-        while self.order_book_buy and self.order_book_sell:
-            best_buy = self.order_book_buy[0]
-            best_sell = self.order_book_sell[0]
+        while buy_heap and sell_heap:
+            best_buy = buy_heap[0][2]
+            best_sell = sell_heap[0][2]
 
             if best_buy.price >= best_sell.price:
                 trade_price = (best_buy.price + best_sell.price) / 2
@@ -164,12 +168,17 @@ class StockMarketMechanism(Mechanism):
                 best_sell.quantity -= trade_quantity
 
                 if best_buy.quantity == 0:
-                    self.order_book_buy.pop(0)
+                    heapq.heappop(buy_heap)
                 if best_sell.quantity == 0:
-                    self.order_book_sell.pop(0)
+                    heapq.heappop(sell_heap)
             else:
                 break
 
+        if trades:
+            # Keep resting orders in arrival order so time priority carries over
+            self.order_book_buy = [order for order in self.order_book_buy if order.quantity > 0]
+            self.order_book_sell = [order for order in self.order_book_sell if order.quantity > 0]
+
         return trades
 
     def _get_order_book_summary(self) -> Dict[str, List[Tuple[float, int]]]:
@@ -9,8 +9,9 @@ from market_agents.inference.parallel_inference import ParallelAIUtilities, Requ
 from market_agents.inference.message_models import LLMPromptContext, LLMOutput, LLMConfig
 from market_agents.simple_agent import SimpleAgent, create_simple_agents_from_zi
 from pydantic import BaseModel, Field, computed_field
-from typing import List, Tuple, Optional, Dict, Union, Set
+from typing import Any, List, Tuple, Optional, Dict, Union, Set
 import logging
+import numpy as np
 from statistics import mean, stdev
 from dotenv import load_dotenv
 
@@ -227,6 +228,8 @@ class MarketOrchestrator:
         self.agents_dict, self.llm_agents_dict, self.zi_agents_dict = self.create_agents_dicts(clones_config)
         self.agents = list(self.agents_dict.values())
         self.failed_actions: List[LLMOutput] = []
+        self.agent_soa: Dict[str, Dict[str, Any]] = {}
+        self._equilibrium: Optional[Equilibrium] = None
         if self.scenario:
             name = self.scenario.name+"_state"
         else:
@@ -234,8 +237,12 @@ class MarketOrchestrator:
         self.state = MarketOrchestratorState(name=name)
 
     def get_current_equilibrium(self) -> Equilibrium:
-        typed_agents = [agent for agent in self.agents if isinstance(agent, EconomicAgent)]
-        return Equilibrium(agents=typed_agents, goods=self.goods)
+        # Schedules are static and self.agents is fixed at construction,
+        # so the equilibrium is built once and reused for every step
+        if self._equilibrium is None:
+            typed_agents = [agent for agent in self.agents if isinstance(agent, EconomicAgent)]
+            self._equilibrium = Equilibrium(agents=typed_agents, goods=self.goods)
+        return self._equilibrium
 
     def create_markets(self, goods: List[str]) -> Dict[str, AuctionMarket]:
         markets_dict = {}
@@ -272,16 +279,53 @@ class MarketOrchestrator:
     def get_agent(self, agent_id: str) -> Union[SimpleAgent, EconomicAgent]:
         return self.agents_dict[agent_id]
     
+    def _refresh_agent_soa(self, good_name: str) -> Dict[str, Any]:
+        """ Snapshot the zero-intelligence agents trading good_name into per-agent columns
+        (role, holdings, pending quantity, available cash, unit cap) so eligibility is a single vector compare.
+        Each agent's basket is rebuilt once here rather than again in its own eligibility check.
+        Role and unit cap come from the static preference schedules and are only computed once """
+        soa = self.agent_soa.get(good_name)
+        if soa is None:
+            agents = [agent for agent in self.get_zero_intelligence_agents() if agent.is_buyer(good_name) or agent.is_seller(good_name)]
+            is_buyer = np.fromiter((agent.is_buyer(good_name) for agent in agents), dtype=bool, count=len(agents))
+            max_units = np.fromiter(
+                (agent.value_schedules[good_name].num_units if buyer else 0 for agent, buyer in zip(agents, is_buyer)),
+                dtype=np.int64, count=len(agents))
+            soa = self.agent_soa[good_name] = {"agents": agents, "is_buyer": is_buyer, "max_units": max_units}
+
+        agents = soa["agents"]
+        count = len(agents)
+        goods = np.empty(count, dtype=np.int64)
+        pending = np.empty(count, dtype=np.int64)
+        cash = np.zeros(count, dtype=np.float64)
+        for index, (agent, buyer) in enumerate(zip(agents, soa["is_buyer"].tolist())):
+            basket = agent.endowment.current_basket
+            goods[index] = basket.get_good_quantity(good_name)
+            if buyer:
+                pending[index] = agent.get_pending_bid_quantity(good_name)
+                cash[index] = basket.cash - agent.pending_cash
+            else:
+                pending[index] = agent.get_pending_ask_quantity(good_name)
+        soa["goods"] = goods
+        soa["pending"] = pending
+        soa["cash"] = cash
+        return soa
+
     def create_local_actions_zero_intelligence(self, good_name: str) -> Dict[str, AuctionAction]:
         actions = {}
-        agents = [agent for agent in self.get_zero_intelligence_agents() if good_name in agent.cost_schedules.keys() or good_name in agent.value_schedules.keys()]
-        for agent in agents:
-            bid = agent.generate_bid(good_name)
-            ask = agent.generate_ask(good_name)
-            if bid:
-                actions[agent.id] = AuctionAction(agent_id=agent.id, action=bid)
-            elif ask:
-                actions[agent.id] = AuctionAction(agent_id=agent.id, action=ask)
+        soa = self._refresh_agent_soa(good_name)
+        # Same rules as EconomicAgent._can_generate_bid/_can_generate_ask, applied to every agent at once,
+        # so the selected agents go straight to pricing their order
+        can_trade = np.where(
+            soa["is_buyer"],
+            EconomicAgent.can_bid(soa["cash"], soa["goods"], soa["pending"], soa["max_units"]),
+            EconomicAgent.can_ask(soa["goods"], soa["pending"])
+        )
+        for index in np.nonzero(can_trade)[0].tolist():
+            agent = soa["agents"][index]
+            market_action = agent.place_bid(good_name) if soa["is_buyer"][index] else agent.place_ask(good_name)
+            if market_action:
+                actions[agent.id] = AuctionAction(agent_id=agent.id, action=market_action)
         return actions
     
     async def run_parallel_ai_completion(self, prompts: List[SimpleAgent], update_history: bool = True) -> List[LLMOutput]:
@@ -303,7 +347,7 @@ class MarketOrchestrator:
                     # print(f"adding bid to pending orders")
                     market_action = bid
                 else:
-                    print(f"not adding bid to pending orders")
+                    logger.debug("not adding bid from agent %s to pending orders", agent_id)
             elif "Ask" in output.json_object.name:
                 ask = Ask.model_validate(output.json_object.object)
                 current_cost = agent.get_current_cost(good_name)
@@ -312,7 +356,7 @@ class MarketOrchestrator:
                     # print(f"adding ask {ask} from agent {agent.id} with current_cost {current_cost} to pending orders")
                     market_action = ask
                 else:
-                    print(f"not adding ask to pending orders")
+                    logger.debug("not adding ask from agent %s to pending orders", agent_id)
         if market_action is not None:
             agent.pending_orders.setdefault(good_name, []).append(market_action)
         else:
@@ -346,15 +390,15 @@ class MarketOrchestrator:
         if buyer is None or seller is None:
             raise ValueError(f"Trade {trade} has invalid agent IDs")
         
-        buyer_utility_before = buyer.calculate_utility(buyer.endowment.current_basket)
-        seller_utility_before = seller.calculate_utility(seller.endowment.current_basket)
+        # Bids are priced below value and asks above cost when they are generated or
+        # validated, and the auction only crosses bid >= ask, so surplus is never negative.
+        buyer_surplus = buyer.calculate_trade_surplus(trade)
+        seller_surplus = seller.calculate_trade_surplus(trade)
+        assert buyer_surplus >= 0 and seller_surplus >= 0, f"Trade {trade.trade_id} has negative surplus"
         buyer.process_trade(trade)
         seller.process_trade(trade)
-        buyer_utility_after = buyer.calculate_utility(buyer.endowment.current_basket)
-        seller_utility_after = seller.calculate_utility(seller.endowment.current_basket)
-        trade_surplus = buyer_utility_after - buyer_utility_before + seller_utility_after - seller_utility_before
 
-        return trade_surplus
+        return buyer_surplus + seller_surplus
     
     def process_trades(self, global_observation: AuctionGlobalObservation) -> List[float]:
         surplus = []
@@ -407,30 +451,40 @@ class MarketOrchestrator:
         return step_result, surplus
     
     async def run_auction_episode(self, max_rounds: int, good_name: str,report:bool=True,reset_endowments:bool=True):
+        # Every episode starts from round 0 with an empty order book, otherwise the mechanism
+        # reports done right away and stale orders from the last episode get matched
+        self.markets[good_name].reset()
         relevant_agents = [agent for agent in self.agents if good_name in agent.cost_schedules.keys() or good_name in agent.value_schedules.keys()]
         
         all_trades: List[Trade] = []
-        per_trade_surplus: List[float] = []
-        per_trade_quantities: List[int] = []
-
-        for round in range(max_rounds):
-            logger.info(f"Round {round + 1}")
-            # print(f"Round {round + 1} with agent names: {[agent.id for agent in relevant_agents]}")
+        # Running totals so the cumulative series grow in O(1) per trade
+        cumulative_surplus: List[float] = []
+        cumulative_quantities: List[int] = []
+        surplus_total = 0.0
+        quantity_total = 0
+
+        for round_num in range(1, max_rounds + 1):
+            logger.info("Round %d", round_num)
             # Run one step of the orchestrator
             step_result, surplus = await self.run_auction_step(good_name)
-            per_trade_surplus.extend(surplus)
+            for trade_surplus in surplus:
+                surplus_total += trade_surplus
+                cumulative_surplus.append(surplus_total)
             # Process trades
             global_observation = step_result.global_observation
             assert isinstance(global_observation, AuctionGlobalObservation)
             new_trades = global_observation.all_trades
             all_trades.extend(new_trades)
-            quantities = [trade.quantity for trade in new_trades]
-            per_trade_quantities.extend(quantities)
+            for trade in new_trades:
+                quantity_total += trade.quantity
+                cumulative_quantities.append(quantity_total)
             
             if new_trades:
-                logger.info(f"Trades executed in this round: {len(new_trades)}")
-                for trade in new_trades:
-                    logger.info(f"Trade executed at price: {trade.price}")
+                logger.info("Trades executed in this round: %d, average price: %.2f",
+                            len(new_trades), sum(trade.price for trade in new_trades) / len(new_trades))
+                if logger.isEnabledFor(logging.DEBUG):
+                    for trade in new_trades:
+                        logger.debug("Trade %d executed at price: %.2f", trade.trade_id, trade.price)
             
             if step_result.done:
                 logger.info("Market simulation completed.")
@@ -441,8 +495,6 @@ class MarketOrchestrator:
         for agent in relevant_agents:
             agent.reset_all_pending_orders()
         
-        cumulative_surplus = [sum(per_trade_surplus[:i+1]) for i in range(len(per_trade_surplus))]
-        cumulative_quantities = [sum(per_trade_quantities[:i+1]) for i in range(len(per_trade_quantities))]
         assert len(cumulative_quantities) == len(cumulative_surplus)
         # Generate market report
         if report:
@@ -236,13 +236,15 @@ def create_simple_agent(agent_id: str, llm_config: LLMConfig, good: Good, is_buy
         value_schedule = BuyerPreferenceSchedule(num_units=num_units, base_value=starting_value)
         cost_schedules = {}
         value_schedules = {good.name: value_schedule}
-        new_message = f"You are a buyer of {good.name} and your current value is {value_schedule.get_value(1)}, this is the first round of the market so the are not bids or asks yet. You can make a profit by buying at " + str(value_schedule.get_value(1)*0.99) + " or lower"
+        first_unit_value = value_schedule.get_value(1)
+        new_message = f"You are a buyer of {good.name} and your current value is {first_unit_value}, this is the first round of the market so the are not bids or asks yet. You can make a profit by buying at " + str(first_unit_value*0.99) + " or lower"
         structured_output = BidTool()
     else:
         value_schedules = {}
         cost_schedule = SellerPreferenceSchedule(num_units=num_units, base_value=starting_value)
         cost_schedules = {good.name: cost_schedule}
-        new_message = f"You are a seller of {good.name} and your current cost is {cost_schedule.get_value(1)}, this is the first round of the market so the are not bids or asks yet. You can make a profit by selling at " + str(cost_schedule.get_value(1)*1.01) + " or higher"
+        first_unit_cost = cost_schedule.get_value(1)
+        new_message = f"You are a seller of {good.name} and your current cost is {first_unit_cost}, this is the first round of the market so the are not bids or asks yet. You can make a profit by selling at " + str(first_unit_cost*1.01) + " or higher"
         structured_output = AskTool()
     return SimpleAgent(id=agent_id, llm_config=llm_config,structured_output=structured_output, endowment=endowment, value_schedules=value_schedules, cost_schedules=cost_schedules, new_message=new_message)
 
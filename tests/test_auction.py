@@ -0,0 +1,101 @@
+# test_auction.py
+
+import unittest
+import numpy as np
+from market_agents.environments.mechanisms.auction import AuctionMarket, DoubleAuction, AuctionAction, GlobalAuctionAction, _match_kernel
+from market_agents.economics.econ_models import Bid, Ask
+
+class TestDoubleAuctionMechanism(unittest.TestCase):
+    def setUp(self):
+        self.mechanism = DoubleAuction(max_rounds=3, good_name="apple")
+
+    def _step(self, orders):
+        actions = {
+            agent_id: AuctionAction(agent_id=agent_id, action=order)
+            for agent_id, order in orders.items()
+        }
+        return self.mechanism.step(GlobalAuctionAction(actions=actions))
+
+    def test_matches_best_bid_with_best_ask(self):
+        step_result = self._step({
+            "b0": Bid(price=10.0, quantity=1),
+            "b1": Bid(price=12.0, quantity=1),
+            "s0": Ask(price=9.0, quantity=1),
+            "s1": Ask(price=8.0, quantity=1),
+        })
+        trades = step_result.global_observation.all_trades
+        self.assertEqual(len(trades), 2)
+        self.assertEqual((trades[0].buyer_id, trades[0].seller_id, trades[0].price), ("b1", "s1", 10.0))
+        self.assertEqual((trades[1].buyer_id, trades[1].seller_id, trades[1].price), ("b0", "s0", 9.5))
+        self.assertEqual(self.mechanism.waiting_bids, [])
+        self.assertEqual(self.mechanism.waiting_asks, [])
+
+    def test_unmatched_orders_keep_arrival_order(self):
+        self._step({
+            "b0": Bid(price=5.0, quantity=1),
+            "b1": Bid(price=7.0, quantity=1),
+            "b2": Bid(price=20.0, quantity=1),
+            "s0": Ask(price=15.0, quantity=1),
+        })
+        self.assertEqual([bid.agent_id for bid in self.mechanism.waiting_bids], ["b0", "b1"])
+        self.assertEqual(self.mechanism.waiting_asks, [])
+
+    def test_equal_prices_fill_in_arrival_order(self):
+        step_result = self._step({
+            "b0": Bid(price=10.0, quantity=1),
+            "b1": Bid(price=10.0, quantity=1),
+            "s0": Ask(price=9.0, quantity=1),
+        })
+        trades = step_result.global_observation.all_trades
+        self.assertEqual([trade.buyer_id for trade in trades], ["b0"])
+        self.assertEqual([bid.agent_id for bid in self.mechanism.waiting_bids], ["b1"])
+
+    def test_no_trade_when_spread_does_not_cross(self):
+        step_result = self._step({
+            "b0": Bid(price=5.0, quantity=1),
+            "s0": Ask(price=6.0, quantity=1),
+        })
+        self.assertEqual(step_result.global_observation.all_trades, [])
+        self.assertEqual(len(self.mechanism.waiting_bids), 1)
+        self.assertEqual(len(self.mechanism.waiting_asks), 1)
+
+    def test_one_sided_book_keeps_orders_waiting(self):
+        step_result = self._step({
+            "b0": Bid(price=5.0, quantity=1),
+            "b1": Bid(price=7.0, quantity=1),
+        })
+        self.assertEqual(step_result.global_observation.all_trades, [])
+        self.assertEqual([bid.agent_id for bid in self.mechanism.waiting_bids], ["b0", "b1"])
+        self.assertEqual(set(step_result.global_observation.observations), {"b0", "b1"})
+
+class TestMatchKernel(unittest.TestCase):
+    def test_partial_fills_keep_residual_at_head_of_book(self):
+        bid_quantities = np.array([3, 2], dtype=np.int64)
+        ask_quantities = np.array([1, 4, 1], dtype=np.int64)
+        bid_rows, ask_rows, prices, quantities = _match_kernel(
+            np.array([12.0, 10.0]), bid_quantities, np.array([8.0, 9.0, 11.0]), ask_quantities
+        )
+        fills = list(zip(bid_rows.tolist(), ask_rows.tolist(), prices.tolist(), quantities.tolist()))
+        self.assertEqual(fills, [(0, 0, 10.0, 1), (0, 1, 10.5, 2), (1, 1, 9.5, 2)])
+        self.assertEqual(bid_quantities.tolist(), [0, 0])
+        self.assertEqual(ask_quantities.tolist(), [0, 0, 1])
+
+class TestAuctionMarket(unittest.TestCase):
+    def test_reset_clears_mechanism_for_next_episode(self):
+        market = AuctionMarket(mechanism=DoubleAuction(max_rounds=1, good_name="apple"))
+        actions = {
+            "b0": AuctionAction(agent_id="b0", action=Bid(price=5.0, quantity=1)),
+            "s0": AuctionAction(agent_id="s0", action=Ask(price=6.0, quantity=1)),
+        }
+        self.assertTrue(market.step(GlobalAuctionAction(actions=actions)).done)
+
+        market.reset()
+        self.assertEqual(market.current_step, 0)
+        self.assertEqual(market.mechanism.current_round, 0)
+        self.assertEqual(market.mechanism.waiting_bids, [])
+        self.assertEqual(market.mechanism.waiting_asks, [])
+        step_result = market.step(GlobalAuctionAction(actions={}))
+        self.assertEqual(step_result.info["current_round"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# test_econ_agent.py
+
+import random
+import unittest
+import numpy as np
+from market_agents.economics.econ_agent import EconomicAgent, ZiParams
+from market_agents.economics.econ_models import Bid, Ask, Trade
+
+class TestTradeSurplus(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.buyer = EconomicAgent.from_zi_params(ZiParams(
+            id="buyer_0", initial_cash=1000.0, initial_goods={"apple": 0}, base_values={"apple": 20.0},
+            num_units=5, noise_factor=0.1, max_relative_spread=0.2, is_buyer=True
+        ))
+        self.seller = EconomicAgent.from_zi_params(ZiParams(
+            id="seller_0", initial_cash=0.0, initial_goods={"apple": 5}, base_values={"apple": 10.0},
+            num_units=5, noise_factor=0.1, max_relative_spread=0.2, is_buyer=False
+        ))
+        self.trade_id = 0
+
+    def _next_trade(self) -> Trade:
+        bid = self.buyer.generate_bid("apple")
+        ask = self.seller.generate_ask("apple")
+        trade = Trade(
+            trade_id=self.trade_id,
+            buyer_id=self.buyer.id,
+            seller_id=self.seller.id,
+            price=(bid.price + ask.price) / 2,
+            quantity=1,
+            good_name="apple",
+            bid_price=bid.price,
+            ask_price=ask.price
+        )
+        self.trade_id += 1
+        return trade
+
+    def test_trade_surplus_matches_utility_change(self):
+        # The first trade leaves both agents with a unit already traded, so the
+        # later trades read the schedules past the first unit
+        for _ in range(3):
+            trade = self._next_trade()
+            for agent in (self.buyer, self.seller):
+                utility_before = agent.calculate_utility(agent.endowment.current_basket)
+                surplus = agent.calculate_trade_surplus(trade)
+                agent.process_trade(trade)
+                utility_after = agent.calculate_utility(agent.endowment.current_basket)
+                self.assertAlmostEqual(surplus, utility_after - utility_before)
+        self.assertEqual(self.buyer.endowment.current_basket.get_good_quantity("apple"), 3)
+        self.assertEqual(self.seller.endowment.current_basket.get_good_quantity("apple"), 2)
+
+class TestOrderEligibility(unittest.TestCase):
+    def _buyer(self, initial_cash: float) -> EconomicAgent:
+        return EconomicAgent.from_zi_params(ZiParams(
+            id="buyer_0", initial_cash=initial_cash, initial_goods={"apple": 0}, base_values={"apple": 20.0},
+            num_units=2, noise_factor=0.1, max_relative_spread=0.2, is_buyer=True
+        ))
+
+    def _seller(self) -> EconomicAgent:
+        return EconomicAgent.from_zi_params(ZiParams(
+            id="seller_0", initial_cash=0.0, initial_goods={"apple": 2}, base_values={"apple": 10.0},
+            num_units=2, noise_factor=0.1, max_relative_spread=0.2, is_buyer=False
+        ))
+
+    def test_vectorized_rules_match_agent_checks(self):
+        broke_buyer = self._buyer(0.0)
+        capped_buyer = self._buyer(1000.0)
+        capped_buyer.pending_orders["apple"] = [Bid(price=1.0, quantity=1), Bid(price=1.0, quantity=1)]
+        open_buyer = self._buyer(1000.0)
+        sold_out_seller = self._seller()
+        sold_out_seller.pending_orders["apple"] = [Ask(price=50.0, quantity=1), Ask(price=50.0, quantity=1)]
+        open_seller = self._seller()
+        buyers = [broke_buyer, capped_buyer, open_buyer]
+        sellers = [sold_out_seller, open_seller]
+
+        expected_bids = [buyer._can_generate_bid("apple") for buyer in buyers]
+        expected_asks = [seller._can_generate_ask("apple") for seller in sellers]
+        self.assertEqual(expected_bids, [False, False, True])
+        self.assertEqual(expected_asks, [False, True])
+
+        buyer_state = [
+            (buyer.available_cash, buyer.endowment.current_basket.get_good_quantity("apple"),
+             buyer.get_pending_bid_quantity("apple"), buyer.value_schedules["apple"].num_units)
+            for buyer in buyers
+        ]
+        seller_state = [
+            (seller.endowment.current_basket.get_good_quantity("apple"), seller.get_pending_ask_quantity("apple"))
+            for seller in sellers
+        ]
+        self.assertEqual([bool(EconomicAgent.can_bid(*state)) for state in buyer_state], expected_bids)
+        self.assertEqual([bool(EconomicAgent.can_ask(*state)) for state in seller_state], expected_asks)
+
+        buyer_columns = [np.array(column) for column in zip(*buyer_state)]
+        seller_columns = [np.array(column) for column in zip(*seller_state)]
+        self.assertEqual(EconomicAgent.can_bid(*buyer_columns).tolist(), expected_bids)
+        self.assertEqual(EconomicAgent.can_ask(*seller_columns).tolist(), expected_asks)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# test_stock_market.py
+
+import unittest
+from market_agents.environments.mechanisms.stock_market import StockMarketMechanism, StockMarketAction, GlobalStockMarketAction
+from market_agents.stock_market.stock_models import OrderType, MarketAction
+
+class TestStockMarketMechanism(unittest.TestCase):
+    def setUp(self):
+        self.mechanism = StockMarketMechanism(max_rounds=3)
+
+    def _step(self, orders):
+        actions = {
+            agent_id: StockMarketAction(
+                agent_id=agent_id,
+                action=MarketAction(order_type=order_type, price=price, quantity=quantity)
+            )
+            for agent_id, (order_type, price, quantity) in orders.items()
+        }
+        return self.mechanism.step(GlobalStockMarketAction(actions=actions))
+
+    def test_partial_fill_stays_at_top_of_book(self):
+        step_result = self._step({
+            "b0": (OrderType.BUY, 101.0, 5),
+            "s0": (OrderType.SELL, 99.0, 2),
+            "s1": (OrderType.SELL, 100.0, 2),
+            "s2": (OrderType.SELL, 102.0, 4),
+        })
+        trades = step_result.global_observation.all_trades
+        self.assertEqual([(trade.seller_id, trade.quantity) for trade in trades], [("s0", 2), ("s1", 2)])
+        self.assertEqual([(order.agent_id, order.quantity) for order in self.mechanism.order_book_buy], [("b0", 1)])
+        self.assertEqual([order.agent_id for order in self.mechanism.order_book_sell], ["s2"])
+
+    def test_equal_prices_fill_in_arrival_order(self):
+        step_result = self._step({
+            "z_buyer": (OrderType.BUY, 100.0, 1),
+            "a_buyer": (OrderType.BUY, 100.0, 1),
+            "s0": (OrderType.SELL, 100.0, 1),
+        })
+        trades = step_result.global_observation.all_trades
+        self.assertEqual([trade.buyer_id for trade in trades], ["z_buyer"])
+        self.assertEqual([order.agent_id for order in self.mechanism.order_book_buy], ["a_buyer"])
+
+        step_result = self._step({"s1": (OrderType.SELL, 100.0, 1)})
+        self.assertEqual([trade.buyer_id for trade in step_result.global_observation.all_trades], ["a_buyer"])
+        self.assertEqual(self.mechanism.order_book_buy, [])
+
+if __name__ == '__main__':
+    unittest.main()